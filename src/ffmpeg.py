@@ -10,7 +10,22 @@ class FFMpeg:
         pass
 
     @staticmethod
-    def combine_audio_with_image(image_path: str, audio_path: str, output_path: str):
+    def combine_audio_with_image(image_path: str, audio_path: str, output_path: str, draft: bool = False):
+        # Drafts trade quality for speed, but keep the default frame rate so that every slide ends
+        # on the same frame boundary as in the final render and the timelines line up.
+        # Their narration mixes cached OpenAI audio with local pyttsx3 audio, so it is resampled
+        # to one format for the stream copy in concatenate_videos
+        encoding = [
+            "-preset", "ultrafast",
+            "-tune", "stillimage",
+            "-crf", "32",
+            "-ar", "24000",
+            "-ac", "1",
+        ] if draft else [
+            "-preset", "fast",  # Use fast preset for speed
+            "-crf", "23",  # Adjust CRF (Constant Rate Factor) for quality vs. size tradeoff
+        ]
+
         ffmpeg_command = [
             "ffmpeg",
             "-y",
@@ -21,8 +36,7 @@ class FFMpeg:
             "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2",  # Ensure dimensions are divisible by 2
             "-profile:v", "high",  # Use high profile
             "-level", "4.0",  # Use level 4.0
-            "-preset", "fast",  # Use fast preset for speed
-            "-crf", "23",  # Adjust CRF (Constant Rate Factor) for quality vs. size tradeoff
+            *encoding,
             "-pix_fmt", "yuv420p",  # Use YUV 4:2:0 pixel format for wider compatibility
             "-c:a", "aac",
             "-strict", "experimental",
@@ -32,7 +46,8 @@ class FFMpeg:
         subprocess.run(ffmpeg_command)
 
     @staticmethod
-    def combine_audio_with_image_multi(slides: List[str], audios: List[str], output_folder="dir") -> List[str]:
+    def combine_audio_with_image_multi(slides: List[str], audios: List[str], output_folder="dir",
+                                       draft: bool = False) -> List[str]:
         """
         Create a video for each slide and audio pair.
 
@@ -40,6 +55,7 @@ class FFMpeg:
             slides (List[str]): List of paths to slide images.
             audios (List[str]): List of paths to audio files.
             output_folder (str): Folder where the output videos will be saved.
+            draft (bool): Encode quickly at low quality for previews.
         Returns:
             List[str]: List of paths to the generated videos.
         """
@@ -48,17 +64,19 @@ class FFMpeg:
             video_paths = []
             for i, (slide, audio) in enumerate(zip(slides, audios)):
                 output_path = os.path.join(output_folder, f"video_{i}.mp4")
-                executor.submit(FFMpeg.combine_audio_with_image, slide, audio, output_path)
+                executor.submit(FFMpeg.combine_audio_with_image, slide, audio, output_path, draft)
                 video_paths.append(output_path)
 
         return video_paths
 
     @staticmethod
     def concatenate_videos(input_files, output_path):
-        # Write a temporary file listing input files
-        with open('input_files.txt', 'w') as f:
+        # Write a temporary file listing input files next to the inputs, so that
+        # concurrent jobs working in separate folders do not share one list
+        list_path = os.path.join(os.path.dirname(input_files[0]), "input_files.txt")
+        with open(list_path, 'w') as f:
             for file in input_files:
-                f.write(f"file '{file}'\n")
+                f.write(f"file '{os.path.abspath(file)}'\n")
 
         # Run ffmpeg to concatenate videos
         subprocess.run([
@@ -66,20 +84,22 @@ class FFMpeg:
             "-y",  # Overwrite output file if it exists
             "-f", "concat",  # Use concat demuxer
             "-safe", "0",  # Allow input file paths to be interpreted as relative paths
-            "-i", "input_files.txt",  # Input file listing
+            "-i", list_path,  # Input file listing
             "-c", "copy",  # Use copy codec for fast concatenation
             output_path
         ])
 
         # Delete the temporary file
-        os.remove('input_files.txt')
+        os.remove(list_path)
 
     @staticmethod
     def concatenate_audios(input_files, output_path):
-        # Write a temporary file listing input files
-        with open('input_files.txt', 'w') as f:
+        # Write a temporary file listing input files next to the inputs, so that
+        # concurrent jobs working in separate folders do not share one list
+        list_path = os.path.join(os.path.dirname(input_files[0]), "input_files.txt")
+        with open(list_path, 'w') as f:
             for file in input_files:
-                f.write(f"file '{file}'\n")
+                f.write(f"file '{os.path.abspath(file)}'\n")
 
         # Run ffmpeg to concatenate videos
         subprocess.run([
@@ -87,13 +107,13 @@ class FFMpeg:
             "-y",
             "-f", "concat",
             "-safe", "0",
-            "-i", "input_files.txt",
+            "-i", list_path,
             "-c:a", "mp3",
             output_path
         ])
 
         # Delete the temporary file
-        os.remove('input_files.txt')
+        os.remove(list_path)
 
     @staticmethod
     def extract_audio_from_video(video_path: str, output_path="dir/audio.mp3"):
@@ -29,6 +29,7 @@ class VideoGenerationThread(QThread):
         self.selected_voice = selected_voice
         self.video_name = video_name
         self.video_location = video_location
+        self.output_path = f"{video_location}/{video_name}.mp4"
         self.srt_location = srt_location
 
     def run(self):
@@ -39,7 +40,7 @@ class VideoGenerationThread(QThread):
         else:
             script = util.extract_pptx_notes(self.pptx_file)
 
-        audios = util.text_to_speech(script, self.selected_voice, OPENAI_API_KEY)
+        audios = util.text_to_speech(script, self.selected_voice, OPENAI_API_KEY, cache_dir=util.NARRATION_CACHE)
         slide_videos = ffmpeg.FFMpeg.combine_audio_with_image_multi(slides, audios)
         if self.subtitles_enabled:
             ffmpeg.FFMpeg.concatenate_videos(slide_videos, "dir/concat.mp4")
@@ -50,10 +51,9 @@ class VideoGenerationThread(QThread):
             if self.srt_location:
                 shutil.copyfile(srt, f"{self.srt_location}/{self.video_name}_subtitles.srt")
 
-            ffmpeg.FFMpeg.render_subtitles("dir/concat.mp4",
-                                           srt, f"{self.video_location}/{self.video_name}.mp4")
+            ffmpeg.FFMpeg.render_subtitles("dir/concat.mp4", srt, self.output_path)
         else:
-            ffmpeg.FFMpeg.concatenate_videos(slide_videos, f"{self.video_location}/{self.video_name}.mp4")
+            ffmpeg.FFMpeg.concatenate_videos(slide_videos, self.output_path)
 
         print("Finished video generation, finalising...")
         self.video_generated.emit()
@@ -69,6 +69,7 @@ class DemoGenerationThread(QThread):
         self.pptx_file = pptx_file
         self.video_name = video_name
         self.video_location = video_location
+        self.output_path = f"{video_location}/{video_name}.mp4"
 
     def run(self):
         slides = util.pdf_to_images(self.pdf_file)
@@ -81,7 +82,35 @@ class DemoGenerationThread(QThread):
         audios = util.text_to_speech_demo(script)
         slide_videos = ffmpeg.FFMpeg.combine_audio_with_image_multi(slides, audios)
 
-        ffmpeg.FFMpeg.concatenate_videos(slide_videos, f"{self.video_location}/{self.video_name}.mp4")
+        ffmpeg.FFMpeg.concatenate_videos(slide_videos, self.output_path)
+        self.video_generated.emit()
+
+
+class DraftGenerationThread(QThread):
+    video_generated = pyqtSignal()
+
+    def __init__(self, pdf_file, script_file, pptx_file, selected_voice, video_name, video_location):
+        super().__init__()
+        self.pdf_file = pdf_file
+        self.script_file = script_file
+        self.pptx_file = pptx_file
+        self.selected_voice = selected_voice
+        self.video_name = video_name
+        self.video_location = video_location
+        self.output_path = f"{video_location}/{video_name}_draft.mp4"
+
+    def run(self):
+        slides = util.pdf_to_images(self.pdf_file, dpi=util.DRAFT_DPI)
+
+        if self.script_file:
+            script = util.parse_script_file(self.script_file)
+        else:
+            script = util.extract_pptx_notes(self.pptx_file)
+
+        audios = util.text_to_speech_draft(script, self.selected_voice)
+        slide_videos = ffmpeg.FFMpeg.combine_audio_with_image_multi(slides, audios, draft=True)
+
+        ffmpeg.FFMpeg.concatenate_videos(slide_videos, self.output_path)
         self.video_generated.emit()
 
 
@@ -94,6 +123,7 @@ class AudioGenerationThread(QThread):
         self.pptx_file = pptx_file
         self.video_name = video_name
         self.video_location = video_location
+        self.output_path = f"{video_location}/{video_name}.mp3"
 
     def run(self):
         if self.script_file:
@@ -102,7 +132,7 @@ class AudioGenerationThread(QThread):
             script = util.extract_pptx_notes(self.pptx_file)
 
         audios = util.text_to_speech_demo(script)
-        ffmpeg.FFMpeg.concatenate_audios(audios, f"{self.video_location}/{self.video_name}.mp3")
+        ffmpeg.FFMpeg.concatenate_audios(audios, self.output_path)
         self.audio_generated.emit()
 
 
@@ -215,12 +245,16 @@ class VideoGenerationWindow(QMainWindow):
         self.generate_demo_button = QPushButton("Generate Demo")
         self.generate_demo_button.clicked.connect(self.generate_demo_video)
 
+        self.generate_draft_button = QPushButton("Generate Draft")
+        self.generate_draft_button.clicked.connect(self.generate_draft_video)
+
         self.loading_spinner = pyqtspinner.WaitingSpinner(self, True, True)
 
         self.btn_layout = QHBoxLayout()
 
         self.btn_layout.addWidget(self.generate_button)
         self.btn_layout.addWidget(self.generate_demo_button)
+        self.btn_layout.addWidget(self.generate_draft_button)
 
         self.script_pptx_labels_layout = QHBoxLayout()
         self.script_pptx_labels_layout.addWidget(self.script_label)
@@ -334,6 +368,23 @@ class VideoGenerationWindow(QMainWindow):
             self.thread.video_generated.connect(self.video_generation_complete)
             self.thread.start()
 
+    def generate_draft_video(self):
+        pdf_file = self.pdf_entry.text()
+        script_file = self.script_entry.text()
+        pptx_file = self.pptx_entry.text()
+        selected_voice = self.voice_combo.currentText()
+        video_name = self.video_name_entry.text()
+        video_location = self.video_location_entry.text()
+        if pdf_file and (script_file or pptx_file) and video_name and video_location:
+            self.loading_spinner.start()
+            self.generate_button.setEnabled(False)
+
+            # Start video generation thread
+            self.thread = DraftGenerationThread(pdf_file, script_file, pptx_file, selected_voice,
+                                                video_name, video_location)
+            self.thread.video_generated.connect(self.video_generation_complete)
+            self.thread.start()
+
     def generate_audio(self):
         script_file = self.script_entry.text()
         pptx_file = self.pptx_entry.text()
@@ -361,7 +412,7 @@ class VideoGenerationWindow(QMainWindow):
         msg_box = QMessageBox()
         msg_box.setIcon(QMessageBox.Information)
         msg_box.setText(
-            f"Generation complete. Video is located at {self.video_location_entry.text()}/{self.video_name_entry.text()}")
+            f"Generation complete. Output is located at {self.thread.output_path}")
         msg_box.setWindowTitle("Video Generated")
         msg_box.setStandardButtons(QMessageBox.Ok)
 
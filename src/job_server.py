@@ -0,0 +1,481 @@
+import argparse
+import base64
+import itertools
+import json
+import os
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import ffmpeg
+import subtitle_generator
+import util
+
+OPENAI_API_KEY = os.getenv("APIKEY")
+
+VOICES = ["alloy", "echo", "fable", "onyx", "nova", "shimmer"]
+
+# Largest submission accepted, base64 overhead included
+MAX_REQUEST_BYTES = 256 * 1024 * 1024
+
+# Stages of the generation pipeline, in order, used to report progress
+STAGES = ["queued", "rasterizing", "narrating", "encoding", "subtitling", "done"]
+
+# pyttsx3 drives a single native speech engine, so demo narration is serialised across workers
+_demo_tts_lock = threading.Lock()
+
+
+class Job:
+    def __init__(self, job_id: str, priority: int, work_dir: str, pdf_file: str, script_file: str,
+                 pptx_file: str, selected_voice: str, subtitles_enabled: bool, demo: bool, draft: bool):
+        self.job_id = job_id
+        self.priority = priority
+        self.work_dir = work_dir
+        self.pdf_file = pdf_file
+        self.script_file = script_file
+        self.pptx_file = pptx_file
+        self.selected_voice = selected_voice
+        self.subtitles_enabled = subtitles_enabled
+        self.demo = demo
+        self.draft = draft
+
+        self.status = "queued"
+        self.stage = "queued"
+        self.error = None
+        self.result_path = None
+        self.srt_path = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def progress(self) -> float:
+        return STAGES.index(self.stage) / (len(STAGES) - 1)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.job_id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": round(self.progress, 2),
+            "priority": self.priority,
+            "draft": self.draft,
+            "error": self.error,
+            "subtitles": self.srt_path is not None,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def generate_lecture(job: Job, api_key: str, base_url: str = None):
+    """
+    Run the full lecture pipeline for a job inside its own working folder.
+
+    Args:
+        job (Job): The job to run. Its stage is updated as the pipeline advances.
+        api_key (str): OpenAI API key used for narration and subtitles.
+        base_url (str, optional): Alternative OpenAI API endpoint, e.g. a local stub.
+    """
+    work_dir = job.work_dir
+
+    job.stage = "rasterizing"
+    slides = util.pdf_to_images(job.pdf_file, work_dir, util.DRAFT_DPI if job.draft else None)
+
+    if job.script_file:
+        script = util.parse_script_file(job.script_file)
+    else:
+        script = util.extract_pptx_notes(job.pptx_file)
+
+    job.stage = "narrating"
+    if job.draft:
+        with _demo_tts_lock:
+            audios = util.text_to_speech_draft(script, job.selected_voice, work_dir)
+    elif job.demo:
+        with _demo_tts_lock:
+            audios = util.text_to_speech_demo(script, work_dir)
+    else:
+        # text_to_speech leaves the shared cache alone when a custom endpoint is in use
+        audios = util.text_to_speech(script, job.selected_voice, api_key, work_dir, base_url, util.NARRATION_CACHE)
+
+    job.stage = "encoding"
+    slide_videos = ffmpeg.FFMpeg.combine_audio_with_image_multi(slides, audios, work_dir, job.draft)
+    output_path = os.path.join(work_dir, "lecture.mp4")
+
+    if job.subtitles_enabled and not (job.demo or job.draft):
+        concat_path = os.path.join(work_dir, "concat.mp4")
+        ffmpeg.FFMpeg.concatenate_videos(slide_videos, concat_path)
+
+        job.stage = "subtitling"
+        audio = ffmpeg.FFMpeg.extract_audio_from_video(concat_path, os.path.join(work_dir, "audio.mp3"))
+        subtitle_gen = subtitle_generator.SubtitleGenerator(api_key, base_url)
+        srt = subtitle_gen.generate_subtitles(audio, os.path.join(work_dir, "subtitles.srt"))
+        ffmpeg.FFMpeg.render_subtitles(concat_path, srt, output_path)
+        job.srt_path = srt
+    else:
+        ffmpeg.FFMpeg.concatenate_videos(slide_videos, output_path)
+
+    if not os.path.isfile(output_path):
+        raise RuntimeError("ffmpeg did not produce an output video")
+
+    job.result_path = output_path
+    job.stage = "done"
+
+
+class JobQueue:
+    """
+    Bounded priority queue of lecture jobs drained by a pool of worker threads.
+
+    Lower priority values run first; jobs with equal priority run in submission order.
+    Jobs that ended more than `retention` seconds ago are removed together with their working folder,
+    and the narration cache is pruned to `narration_cache_limit` bytes if one is given.
+    """
+
+    def __init__(self, workers: int = 2, max_queued: int = 16, work_root: str = "jobs",
+                 api_key: str = OPENAI_API_KEY, base_url: str = None, retention: float = 24 * 3600,
+                 narration_cache_limit: int = None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.retention = retention
+        self.narration_cache_limit = narration_cache_limit
+        self.work_root = os.path.abspath(work_root)
+        os.makedirs(self.work_root, exist_ok=True)
+
+        self.max_queued = max_queued
+        self.jobs = {}
+        self._jobs_lock = threading.Lock()
+        # Unbounded, because cancelled jobs stay in it until a worker pops them; capacity is
+        # enforced on the number of jobs still waiting instead
+        self._queue = queue.PriorityQueue()
+        self._waiting = 0
+        self._counter = itertools.count()
+        self._workers = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        self._stopping = threading.Event()
+        self._sweeper = threading.Thread(target=self._sweep, daemon=True)
+
+    def start(self):
+        for worker in self._workers:
+            worker.start()
+        self._sweeper.start()
+
+    def stop(self):
+        self._stopping.set()
+
+        # Jobs still waiting are cancelled, so shutdown only waits for the ones already running
+        while True:
+            try:
+                _, _, job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                with self._jobs_lock:
+                    self._cancel(job)
+            self._queue.task_done()
+
+        for _ in self._workers:
+            self._queue.put((float("-inf"), next(self._counter), None))
+        for worker in self._workers:
+            worker.join()
+
+    def new_work_dir(self) -> str:
+        return tempfile.mkdtemp(dir=self.work_root)
+
+    def submit(self, job: Job):
+        """
+        Queue a job for generation.
+
+        Raises:
+            queue.Full: If the queue is at capacity. The job is not registered.
+        """
+        with self._jobs_lock:
+            if self._waiting >= self.max_queued:
+                raise queue.Full
+            self.jobs[job.job_id] = job
+            self._waiting += 1
+            self._queue.put((job.priority, next(self._counter), job))
+
+    def get(self, job_id: str):
+        with self._jobs_lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self) -> list:
+        with self._jobs_lock:
+            return list(self.jobs.values())
+
+    def queued(self) -> int:
+        with self._jobs_lock:
+            return self._waiting
+
+    def full(self) -> bool:
+        return self.queued() >= self.max_queued
+
+    def delete(self, job: Job):
+        """
+        Forget a job and remove its working folder, cancelling it first if it is still queued.
+
+        Raises:
+            RuntimeError: If the job is running. It can be deleted once it has ended.
+        """
+        with self._jobs_lock:
+            if job.status == "running":
+                raise RuntimeError("job is running")
+            self._cancel(job)
+            self.jobs.pop(job.job_id, None)
+        shutil.rmtree(job.work_dir, ignore_errors=True)
+
+    def remove_expired(self):
+        cutoff = time.time() - self.retention
+        with self._jobs_lock:
+            expired = [job for job in self.jobs.values() if job.finished_at is not None and job.finished_at < cutoff]
+        for job in expired:
+            self.delete(job)
+
+    def _sweep(self):
+        while not self._stopping.wait(min(max(self.retention, 1), 60)):
+            self.remove_expired()
+            if self.narration_cache_limit is not None:
+                util.prune_narration_cache(self.narration_cache_limit, util.NARRATION_CACHE)
+
+    def _cancel(self, job: Job):
+        # Callers hold _jobs_lock
+        if job.status == "queued":
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            self._waiting -= 1
+
+    def _work(self):
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+
+            with self._jobs_lock:
+                if job.status == "cancelled":
+                    self._queue.task_done()
+                    continue
+                job.status = "running"
+                self._waiting -= 1
+            job.started_at = time.time()
+            try:
+                generate_lecture(job, self.api_key, self.base_url)
+                job.status = "finished"
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                job.finished_at = time.time()
+                self._queue.task_done()
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """
+    Routes:
+        POST /jobs                  submit a job (JSON body, files base64 encoded)
+        GET  /jobs                  list all jobs
+        GET  /jobs/<id>             job status and progress
+        GET  /jobs/<id>/result      download the finished video
+        GET  /jobs/<id>/subtitles   download the generated .srt file
+        DELETE /jobs/<id>           cancel a queued job or remove an ended one and its files
+    """
+
+    job_route = re.compile(r"^/jobs/([0-9a-f]+)(/result|/subtitles)?$")
+
+    @property
+    def job_queue(self) -> JobQueue:
+        return self.server.job_queue
+
+    def do_POST(self):
+        if self.path != "/jobs":
+            self.send_json(404, {"error": "not found"})
+            return
+
+        # Refuse before reading the upload, so rejected clients cost no decoding or disk space
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self.send_json(411, {"error": "Content-Length is required"})
+            return
+        if length > MAX_REQUEST_BYTES:
+            self.send_json(413, {"error": f"submissions are limited to {MAX_REQUEST_BYTES} bytes"})
+            return
+        if self.job_queue.full():
+            self.send_json(503, {"error": "queue is full, retry later"}, {"Retry-After": "30"})
+            return
+
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            self.send_json(400, {"error": "body must be JSON"})
+            return
+
+        try:
+            job = self.create_job(body)
+        except (ValueError, TypeError) as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        except OSError as e:
+            self.send_json(500, {"error": f"could not store the submission: {e}"})
+            return
+
+        try:
+            self.job_queue.submit(job)
+        except queue.Full:
+            # Another submission took the last slot while this one was being stored
+            shutil.rmtree(job.work_dir, ignore_errors=True)
+            self.send_json(503, {"error": "queue is full, retry later"}, {"Retry-After": "30"})
+            return
+
+        self.send_json(202, job.to_dict(), {"Location": f"/jobs/{job.job_id}"})
+
+    def do_GET(self):
+        if self.path == "/jobs":
+            jobs = [job.to_dict() for job in self.job_queue.list_jobs()]
+            self.send_json(200, {"queued": self.job_queue.queued(), "jobs": jobs})
+            return
+
+        match = self.job_route.match(self.path)
+        job = self.job_queue.get(match.group(1)) if match else None
+        if job is None:
+            self.send_json(404, {"error": "not found"})
+            return
+
+        if match.group(2) is None:
+            self.send_json(200, job.to_dict())
+        elif job.status != "finished":
+            self.send_json(409, {"error": f"job is {job.status}"})
+        elif match.group(2) == "/result":
+            self.send_file(job.result_path, "video/mp4")
+        elif job.srt_path:
+            self.send_file(job.srt_path, "application/x-subrip")
+        else:
+            self.send_json(404, {"error": "job has no subtitles"})
+
+    def do_DELETE(self):
+        match = self.job_route.match(self.path)
+        job = self.job_queue.get(match.group(1)) if match and match.group(2) is None else None
+        if job is None:
+            self.send_json(404, {"error": "not found"})
+            return
+
+        try:
+            self.job_queue.delete(job)
+        except RuntimeError as e:
+            self.send_json(409, {"error": str(e)})
+            return
+
+        self.send_json(200, job.to_dict())
+
+    def create_job(self, body: dict) -> Job:
+        if not isinstance(body, dict) or not isinstance(body.get("pdf"), str):
+            raise ValueError("a base64 'pdf' file is required")
+
+        script = body.get("script")
+        pptx = body.get("pptx")
+        if script is not None and not isinstance(script, str):
+            raise ValueError("'script' must be a string")
+        if pptx is not None and not isinstance(pptx, str):
+            raise ValueError("'pptx' must be a base64 string")
+        if script is None and pptx is None:
+            raise ValueError("either a 'script' or a 'pptx' file is required")
+
+        voice = body.get("voice", "alloy")
+        if voice not in VOICES:
+            raise ValueError(f"voice must be one of {', '.join(VOICES)}")
+
+        priority = body.get("priority", 0)
+        if not isinstance(priority, int) or isinstance(priority, bool):
+            raise ValueError("'priority' must be an integer")
+
+        options = {}
+        for name in ("subtitles", "demo", "draft"):
+            options[name] = body.get(name, False)
+            if not isinstance(options[name], bool):
+                raise ValueError(f"'{name}' must be true or false")
+
+        # Decode everything before touching the disk so that bad input leaves nothing behind
+        pdf = base64.b64decode(body["pdf"], validate=True)
+        pptx = base64.b64decode(pptx, validate=True) if script is None else None
+
+        work_dir = self.job_queue.new_work_dir()
+        try:
+            pdf_file = os.path.join(work_dir, "slides.pdf")
+            with open(pdf_file, "wb") as f:
+                f.write(pdf)
+
+            script_file = None
+            pptx_file = None
+            if script is not None:
+                script_file = os.path.join(work_dir, "script.txt")
+                with open(script_file, "w") as f:
+                    f.write(script)
+            else:
+                pptx_file = os.path.join(work_dir, "slides.pptx")
+                with open(pptx_file, "wb") as f:
+                    f.write(pptx)
+        except Exception:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+
+        return Job(uuid.uuid4().hex, priority, work_dir, pdf_file, script_file, pptx_file, voice,
+                   options["subtitles"], options["demo"], options["draft"])
+
+    def send_json(self, code: int, payload: dict, headers: dict = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_file(self, path: str, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(os.path.getsize(path)))
+        self.send_header("Content-Disposition", f'attachment; filename="{os.path.basename(path)}"')
+        self.end_headers()
+        with open(path, "rb") as f:
+            shutil.copyfileobj(f, self.wfile)
+
+
+def create_server(host: str, port: int, job_queue: JobQueue) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), JobRequestHandler)
+    server.job_queue = job_queue
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local job queue for video lecture generation")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=2, help="number of jobs generated in parallel")
+    parser.add_argument("--max-queued", type=int, default=16, help="jobs waiting before submissions are refused")
+    # Kept outside "dir", which the GUI empties after every generation
+    parser.add_argument("--work-root", default="jobs", help="folder holding per-job working files")
+    parser.add_argument("--retention", type=float, default=24 * 3600,
+                        help="seconds a finished job and its files are kept")
+    parser.add_argument("--narration-cache-mb", type=float, default=None,
+                        help="size the shared narration cache is pruned to, unlimited by default")
+    parser.add_argument("--openai-base-url", default=None,
+                        help="alternative OpenAI endpoint, e.g. a local stub for testing")
+    args = parser.parse_args()
+
+    job_queue = JobQueue(args.workers, args.max_queued, args.work_root, OPENAI_API_KEY, args.openai_base_url,
+                         args.retention,
+                         None if args.narration_cache_mb is None else int(args.narration_cache_mb * 1024 * 1024))
+    job_queue.start()
+    server = create_server(args.host, args.port, job_queue)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        job_queue.stop()
@@ -5,8 +5,8 @@ from openai import OpenAI
 
 
 class SubtitleGenerator:
-    def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, base_url: str = None):
+        self.client = OpenAI(api_key=api_key, base_url=base_url)
 
     def generate_subtitles(self, audio_path: str, srt_path="dir/subtitles.srt"):
         print(f"Generating subtitles...")
@@ -1,6 +1,9 @@
 from typing import Literal, List
 from openai import OpenAI
+import hashlib
 import os
+import shutil
+import tempfile
 import fitz
 import pyttsx3
 from pptx import Presentation
@@ -13,14 +16,23 @@ current_dir = os.getcwd()
 base_dir = os.path.dirname(current_dir)
 os.chdir(base_dir)
 
+# Narration already paid for is kept here, so drafts and re-renders of unchanged slides reuse it
+NARRATION_CACHE = "cache/narration"
 
-def pdf_to_images(pdf_path: str, output_folder: str = "dir") -> list:
+TTS_MODEL = "tts-1"
+
+# Rasterisation density for draft previews, about 640x360 for a 16:9 slide
+DRAFT_DPI = 48
+
+
+def pdf_to_images(pdf_path: str, output_folder: str = "dir", dpi: int = None) -> list:
     """
     Convert each page of a PDF into an image and save them in the specified output folder.
 
     Args:
         pdf_path (str): Path to the PDF file.
         output_folder (str): Output folder to save the images. Defaults to "dir".
+        dpi (int, optional): Rendering resolution. Defaults to the PDF's native 72 dpi.
 
     Returns:
         list: List of paths to the generated images.
@@ -36,7 +48,7 @@ def pdf_to_images(pdf_path: str, output_folder: str = "dir") -> list:
         page = pdf_document.load_page(page_number)
 
         # Render the page to an image
-        image = page.get_pixmap()
+        image = page.get_pixmap(dpi=dpi)
 
         # Save the image
         image_path = f"{output_folder}/page_{page_number + 1}.png"
@@ -65,8 +77,65 @@ def extract_pptx_notes(path: str) -> list:
     return notes
 
 
+def narration_cache_path(text: str, voice: str, cache_dir: str = NARRATION_CACHE, model: str = TTS_MODEL) -> str:
+    digest = hashlib.sha256(f"{model}\n{voice}\n{text}".encode("utf-8")).hexdigest()
+    return f"{cache_dir}/{voice}_{digest}.mp3"
+
+
+def copy_from_cache(cached_path: str, mp3_path: str) -> bool:
+    """
+    Copy cached narration to mp3_path and mark it as recently used.
+
+    Returns:
+        bool: False if the narration is not cached.
+    """
+    try:
+        shutil.copyfile(cached_path, mp3_path)
+        os.utime(cached_path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def prune_narration_cache(max_bytes: int, cache_dir: str = NARRATION_CACHE) -> int:
+    """
+    Delete the least recently used narration until the cache fits in max_bytes.
+
+    Args:
+        max_bytes (int): Size the cache may occupy.
+        cache_dir (str, optional): Narration cache to prune. Defaults to NARRATION_CACHE.
+
+    Returns:
+        int: Number of files deleted.
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    # Only finished narration counts, temporary files being written are left alone
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".mp3"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+
+    removed = 0
+    for _, size, entry_path in entries:
+        if total <= max_bytes:
+            break
+        total -= size
+        try:
+            os.remove(entry_path)
+        except FileNotFoundError:
+            continue
+        removed += 1
+
+    return removed
+
+
 def text_to_speech(texts: List[str], voice: Literal["alloy", "echo", "fable", "onyx", "nova", "shimmer"], key: str,
-                   path: str = "dir") -> List[str]:
+                   path: str = "dir", base_url: str = None, cache_dir: str = None) -> List[str]:
     """
     Convert a list of texts to speech using the specified TTS voice and save each audio as an MP3 file.
 
@@ -74,22 +143,44 @@ def text_to_speech(texts: List[str], voice: Literal["alloy", "echo", "fable", "o
         texts (List[str]): The list of texts to be converted to speech.
         voice (Literal["alloy", "echo", "fable", "onyx", "nova", "shimmer"]): The TTS voice to be used.
         path (str, optional): The directory where the audio files will be saved. Defaults to "dir".
+        base_url (str, optional): Alternative OpenAI API endpoint. Defaults to the official API.
+        cache_dir (str, optional): Narration cache to read from and fill. Defaults to no caching.
+            Ignored when base_url is set, so audio from a stub or proxy never reaches the shared cache.
 
     Returns:
         List[str]: List of paths to the generated MP3 files.
     """
-    client = OpenAI(api_key=key)
+    if base_url:
+        cache_dir = None
 
+    client = None
     mp3_paths = []
 
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
     for i, text in enumerate(texts):
-        response = client.audio.speech.create(
-            model="tts-1",
-            voice=voice,
-            input=text
-        )
         mp3_path = f"{path}/audio_{i}.mp3"
-        response.write_to_file(mp3_path)
+        cached_path = narration_cache_path(text, voice, cache_dir) if cache_dir else None
+
+        if not (cached_path and copy_from_cache(cached_path, mp3_path)):
+            # Created on the first miss, so a fully cached render needs no API key
+            if client is None:
+                client = OpenAI(api_key=key, base_url=base_url)
+            response = client.audio.speech.create(
+                model=TTS_MODEL,
+                voice=voice,
+                input=text
+            )
+            response.write_to_file(mp3_path)
+
+            if cached_path:
+                # Copy then rename, so a concurrent reader never sees a half written file
+                fd, tmp_path = tempfile.mkstemp(dir=cache_dir)
+                os.close(fd)
+                shutil.copyfile(mp3_path, tmp_path)
+                os.replace(tmp_path, cached_path)
+
         mp3_paths.append(mp3_path)
 
     return mp3_paths
@@ -109,6 +200,43 @@ def text_to_speech_demo(texts: List[str], path: str = "dir") -> List[str]:
     return mp3_paths
 
 
+def text_to_speech_draft(texts: List[str], voice: str, path: str = "dir",
+                         cache_dir: str = NARRATION_CACHE) -> List[str]:
+    """
+    Narrate texts for a draft preview without calling the paid TTS API.
+
+    Slides whose narration is already cached for the given voice reuse it, so their timing matches
+    the final render exactly. The remaining slides fall back to the local demo voice.
+
+    Args:
+        texts (List[str]): The list of texts to be converted to speech.
+        voice (str): The TTS voice the final render will use, to look up cached narration.
+        path (str, optional): The directory where the audio files will be saved. Defaults to "dir".
+        cache_dir (str, optional): Narration cache to read from. Defaults to NARRATION_CACHE.
+
+    Returns:
+        List[str]: List of paths to the generated audio files.
+    """
+    engine = None
+    mp3_paths = []
+
+    for i, text in enumerate(texts):
+        mp3_path = f"{path}/audio_{i}.mp3"
+        cached_path = narration_cache_path(text, voice, cache_dir)
+
+        if not copy_from_cache(cached_path, mp3_path):
+            if engine is None:
+                engine = pyttsx3.init()
+            engine.save_to_file(text, mp3_path)
+            engine.runAndWait()
+
+        mp3_paths.append(mp3_path)
+
+    if engine is not None:
+        engine.stop()
+    return mp3_paths
+
+
 def parse_script_file(script_path: str) -> list:
     """
     Parse a .txt script file for video slides.
@@ -0,0 +1,316 @@
+import base64
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+for module in ("openai", "fitz", "pptx", "pyttsx3"):
+    pytest.importorskip(module)
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+# util moves to the parent of the working directory on import, as the GUI expects to be started from src
+cwd = os.getcwd()
+os.chdir(SRC_DIR)
+import job_server  # noqa: E402
+import util  # noqa: E402
+os.chdir(cwd)
+
+PDF = base64.b64encode(b"%PDF-1.4").decode()
+
+
+def request(method: str, url: str, body: dict = None):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data, method=method)
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def wait_for(predicate, timeout: float = 10):
+    deadline = time.time() + timeout
+    while not predicate():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def service(tmp_path):
+    started = []
+
+    def start(workers: int = 1, max_queued: int = 4, base_url: str = None, retention: float = 3600):
+        job_queue = job_server.JobQueue(workers, max_queued, str(tmp_path / "jobs"), "test-key", base_url, retention)
+        job_queue.start()
+        server = job_server.create_server("127.0.0.1", 0, job_queue)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        started.append((server, job_queue))
+        return f"http://127.0.0.1:{server.server_address[1]}", job_queue
+
+    yield start
+
+    for server, job_queue in started:
+        server.shutdown()
+        server.server_close()
+        job_queue.stop()
+
+
+@pytest.fixture
+def fake_pipeline(monkeypatch):
+    """Replace generate_lecture with one that writes placeholder outputs once released."""
+    release = threading.Event()
+    order = []
+
+    def generate_lecture(job, api_key, base_url=None):
+        order.append(job.job_id)
+        release.wait(10)
+        job.result_path = os.path.join(job.work_dir, "lecture.mp4")
+        with open(job.result_path, "wb") as f:
+            f.write(b"video")
+        if job.subtitles_enabled:
+            job.srt_path = os.path.join(job.work_dir, "subtitles.srt")
+            with open(job.srt_path, "w") as f:
+                f.write("1\n00:00:00,000 --> 00:00:01,000\nHello\n")
+        job.stage = "done"
+
+    monkeypatch.setattr(job_server, "generate_lecture", generate_lecture)
+    return release, order
+
+
+def submit(url: str, **options):
+    status, headers, body = request("POST", f"{url}/jobs", {"pdf": PDF, "script": "Hello", **options})
+    return status, headers, json.loads(body)
+
+
+def test_jobs_run_in_priority_order(service, fake_pipeline):
+    release, order = fake_pipeline
+    url, job_queue = service(workers=1)
+
+    _, _, blocking = submit(url)
+    wait_for(lambda: job_queue.get(blocking["id"]).status == "running")
+    ids = [submit(url, priority=priority)[2]["id"] for priority in (5, 1, 1)]
+    release.set()
+
+    wait_for(lambda: len(order) == 4)
+    assert order == [blocking["id"], ids[1], ids[2], ids[0]]
+
+
+def test_full_queue_is_refused_with_retry_after(service, fake_pipeline, tmp_path):
+    release, _ = fake_pipeline
+    url, job_queue = service(workers=1, max_queued=1)
+
+    _, _, running = submit(url)
+    wait_for(lambda: job_queue.get(running["id"]).status == "running")
+    assert submit(url)[0] == 202
+
+    status, headers, body = submit(url)
+    assert status == 503
+    assert headers["Retry-After"]
+    assert len(os.listdir(tmp_path / "jobs")) == 2
+    release.set()
+
+
+@pytest.mark.parametrize("body", [
+    {"script": "Hello"},
+    {"pdf": PDF},
+    {"pdf": PDF, "script": 5},
+    {"pdf": PDF, "script": None},
+    {"pdf": "not base64!", "script": "Hello"},
+    {"pdf": PDF, "script": "Hello", "voice": "robot"},
+    {"pdf": PDF, "script": "Hello", "priority": "1"},
+    {"pdf": PDF, "script": "Hello", "demo": "false"},
+    {"pdf": PDF, "script": "Hello", "subtitles": 0},
+])
+def test_invalid_submissions_are_rejected_without_leftovers(service, tmp_path, body):
+    url, _ = service()
+
+    status, _, _ = request("POST", f"{url}/jobs", body)
+
+    assert status == 400
+    assert os.listdir(tmp_path / "jobs") == []
+
+
+def test_oversized_submission_is_refused(service, monkeypatch, tmp_path):
+    monkeypatch.setattr(job_server, "MAX_REQUEST_BYTES", 16)
+    url, _ = service()
+
+    assert submit(url)[0] == 413
+    assert os.listdir(tmp_path / "jobs") == []
+
+
+def test_storage_errors_are_reported(service, monkeypatch):
+    url, job_queue = service()
+
+    def new_work_dir():
+        raise OSError("disk full")
+
+    monkeypatch.setattr(job_queue, "new_work_dir", new_work_dir)
+    status, _, body = submit(url)
+
+    assert status == 500
+    assert "disk full" in body["error"]
+
+
+def test_result_and_subtitles_routes(service, fake_pipeline):
+    release, _ = fake_pipeline
+    url, job_queue = service()
+
+    _, headers, job = submit(url, subtitles=True)
+    assert headers["Location"] == f"/jobs/{job['id']}"
+    assert request("GET", f"{url}/jobs/{job['id']}/result")[0] == 409
+
+    release.set()
+    wait_for(lambda: job_queue.get(job["id"]).status == "finished")
+
+    status, _, body = request("GET", f"{url}/jobs/{job['id']}")
+    assert status == 200
+    assert json.loads(body)["progress"] == 1.0
+    assert request("GET", f"{url}/jobs/{job['id']}/result")[2] == b"video"
+    assert b"Hello" in request("GET", f"{url}/jobs/{job['id']}/subtitles")[2]
+    assert request("GET", f"{url}/jobs/ffff")[0] == 404
+
+
+def test_delete_cancels_queued_job_and_removes_files(service, fake_pipeline):
+    release, order = fake_pipeline
+    url, job_queue = service(workers=1)
+
+    _, _, running = submit(url)
+    wait_for(lambda: job_queue.get(running["id"]).status == "running")
+    _, _, queued = submit(url)
+    work_dir = job_queue.get(queued["id"]).work_dir
+
+    assert request("DELETE", f"{url}/jobs/{running['id']}")[0] == 409
+    assert request("DELETE", f"{url}/jobs/{queued['id']}")[0] == 200
+    assert not os.path.exists(work_dir)
+    assert request("GET", f"{url}/jobs/{queued['id']}")[0] == 404
+
+    release.set()
+    wait_for(lambda: job_queue.get(running["id"]).status == "finished")
+    assert order == [running["id"]]
+
+
+def test_delete_frees_queue_capacity(service, fake_pipeline):
+    release, _ = fake_pipeline
+    url, job_queue = service(workers=1, max_queued=1)
+
+    _, _, running = submit(url)
+    wait_for(lambda: job_queue.get(running["id"]).status == "running")
+    _, _, queued = submit(url)
+    assert submit(url)[0] == 503
+
+    assert request("DELETE", f"{url}/jobs/{queued['id']}")[0] == 200
+    assert job_queue.queued() == 0
+    assert submit(url)[0] == 202
+    release.set()
+
+
+def test_ended_jobs_expire(service, fake_pipeline):
+    release, _ = fake_pipeline
+    release.set()
+    url, job_queue = service(retention=0)
+
+    _, _, job = submit(url)
+    work_dir = job_queue.get(job["id"]).work_dir
+
+    wait_for(lambda: job_queue.get(job["id"]) is None)
+    assert not os.path.exists(work_dir)
+
+
+def test_stop_cancels_queued_jobs(service, fake_pipeline):
+    release, order = fake_pipeline
+    url, job_queue = service(workers=1)
+
+    _, _, running = submit(url)
+    wait_for(lambda: job_queue.get(running["id"]).status == "running")
+    _, _, queued = submit(url)
+
+    threading.Timer(0.2, release.set).start()
+    job_queue.stop()
+
+    assert job_queue.get(running["id"]).status == "finished"
+    assert job_queue.get(queued["id"]).status == "cancelled"
+    assert order == [running["id"]]
+
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    """Answers the speech and transcription endpoints the pipeline uses."""
+
+    speech = b""
+    requests = []
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.requests.append(self.path)
+
+        if self.path.endswith("/audio/speech"):
+            content_type, data = "audio/mpeg", self.speech
+        else:
+            content_type, data = "application/json", json.dumps({
+                "task": "transcribe",
+                "language": "english",
+                "duration": 1.0,
+                "text": "Hello",
+                "segments": [{
+                    "id": 0, "seek": 0, "start": 0.0, "end": 1.0, "text": "Hello", "tokens": [],
+                    "temperature": 0.0, "avg_logprob": 0.0, "compression_ratio": 1.0, "no_speech_prob": 0.0,
+                }],
+            }).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+def test_end_to_end_with_stubbed_openai(service, tmp_path, monkeypatch):
+    import fitz
+
+    speech_path = tmp_path / "speech.mp3"
+    subprocess.run(["ffmpeg", "-y", "-f", "lavfi", "-i", "anullsrc=r=24000:cl=mono", "-t", "1",
+                    str(speech_path)], check=True, capture_output=True)
+    StubOpenAIHandler.speech = speech_path.read_bytes()
+    StubOpenAIHandler.requests = []
+    stub = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenAIHandler)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+
+    pdf = fitz.open()
+    for text in ("Slide one", "Slide two"):
+        pdf.new_page().insert_text((72, 72), text)
+    pdf_data = base64.b64encode(pdf.tobytes()).decode()
+
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(util, "NARRATION_CACHE", str(cache_dir))
+
+    try:
+        url, job_queue = service(base_url=f"http://127.0.0.1:{stub.server_address[1]}/v1")
+        status, _, body = request("POST", f"{url}/jobs",
+                                  {"pdf": pdf_data, "script": "Hello\n#NEXT\nWorld", "subtitles": True})
+        assert status == 202
+        job_id = json.loads(body)["id"]
+
+        wait_for(lambda: job_queue.get(job_id).status in ("finished", "failed"), timeout=120)
+        assert job_queue.get(job_id).status == "finished", job_queue.get(job_id).error
+    finally:
+        stub.shutdown()
+        stub.server_close()
+
+    assert StubOpenAIHandler.requests.count("/v1/audio/speech") == 2
+    assert request("GET", f"{url}/jobs/{job_id}/result")[2]
+    assert b"Hello" in request("GET", f"{url}/jobs/{job_id}/subtitles")[2]
+    # Stub narration must never reach the shared cache
+    assert not cache_dir.exists()
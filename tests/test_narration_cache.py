@@ -0,0 +1,168 @@
+import os
+import sys
+import types
+
+import pytest
+
+for module in ("openai", "fitz", "pptx", "pyttsx3"):
+    pytest.importorskip(module)
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+# util moves to the parent of the working directory on import, as the GUI expects to be started from src
+cwd = os.getcwd()
+os.chdir(SRC_DIR)
+import util  # noqa: E402
+os.chdir(cwd)
+
+
+class FakeOpenAI:
+    """Records clients and speech requests, writing the requested text as the audio."""
+
+    clients = []
+    requests = []
+
+    def __init__(self, api_key=None, base_url=None):
+        self.clients.append((api_key, base_url))
+        self.audio = types.SimpleNamespace(speech=types.SimpleNamespace(create=self.create))
+
+    def create(self, model, voice, input):
+        self.requests.append((model, voice, input))
+        return types.SimpleNamespace(write_to_file=lambda path: open(path, "w").write(f"openai:{input}"))
+
+
+class FakeEngine:
+    inits = 0
+
+    def __init__(self):
+        FakeEngine.inits += 1
+        self.pending = []
+
+    def save_to_file(self, text, path):
+        self.pending.append((text, path))
+
+    def runAndWait(self):
+        for text, path in self.pending:
+            with open(path, "w") as f:
+                f.write(f"local:{text}")
+        self.pending = []
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fakes(monkeypatch):
+    FakeOpenAI.clients = []
+    FakeOpenAI.requests = []
+    FakeEngine.inits = 0
+    monkeypatch.setattr(util, "OpenAI", FakeOpenAI)
+    monkeypatch.setattr(util, "pyttsx3", types.SimpleNamespace(init=FakeEngine))
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    out, cache = tmp_path / "out", tmp_path / "cache"
+    out.mkdir()
+    return str(out), str(cache)
+
+
+def read(paths):
+    return [open(path).read() for path in paths]
+
+
+def test_cache_key_covers_model_voice_and_text():
+    path = util.narration_cache_path("Hello", "alloy", "cache")
+
+    assert path == util.narration_cache_path("Hello", "alloy", "cache")
+    assert path != util.narration_cache_path("Hello", "echo", "cache")
+    assert path != util.narration_cache_path("Hello!", "alloy", "cache")
+    assert path != util.narration_cache_path("Hello", "alloy", "cache", model="tts-1-hd")
+
+
+def test_misses_are_narrated_and_cached(dirs):
+    out, cache = dirs
+
+    audios = util.text_to_speech(["One", "Two"], "alloy", "key", out, cache_dir=cache)
+
+    assert read(audios) == ["openai:One", "openai:Two"]
+    assert len(FakeOpenAI.requests) == 2
+    assert read([util.narration_cache_path("One", "alloy", cache)]) == ["openai:One"]
+
+
+def test_fully_cached_render_needs_no_client(dirs):
+    out, cache = dirs
+    util.text_to_speech(["One", "Two"], "alloy", "key", out, cache_dir=cache)
+    FakeOpenAI.clients = []
+
+    audios = util.text_to_speech(["Two", "One"], "alloy", None, out, cache_dir=cache)
+
+    assert read(audios) == ["openai:Two", "openai:One"]
+    assert FakeOpenAI.clients == []
+
+
+def test_only_new_lines_are_narrated(dirs):
+    out, cache = dirs
+    util.text_to_speech(["One"], "alloy", "key", out, cache_dir=cache)
+    FakeOpenAI.requests = []
+
+    util.text_to_speech(["One", "Three"], "alloy", "key", out, cache_dir=cache)
+
+    assert FakeOpenAI.requests == [(util.TTS_MODEL, "alloy", "Three")]
+
+
+def test_custom_endpoint_bypasses_cache(dirs):
+    out, cache = dirs
+    util.text_to_speech(["One"], "alloy", "key", out, cache_dir=cache)
+    cached = sorted(os.listdir(cache))
+    FakeOpenAI.requests = []
+
+    util.text_to_speech(["One", "Two"], "alloy", "key", out, "http://127.0.0.1:1/v1", cache)
+
+    assert len(FakeOpenAI.requests) == 2
+    assert FakeOpenAI.clients[-1] == ("key", "http://127.0.0.1:1/v1")
+    assert sorted(os.listdir(cache)) == cached
+
+
+def test_draft_uses_cache_and_falls_back_to_local_voice(dirs):
+    out, cache = dirs
+    util.text_to_speech(["One"], "alloy", "key", out, cache_dir=cache)
+
+    audios = util.text_to_speech_draft(["One", "Two"], "alloy", out, cache)
+
+    assert read(audios) == ["openai:One", "local:Two"]
+    assert FakeEngine.inits == 1
+    assert len(FakeOpenAI.requests) == 1
+
+
+def test_draft_of_cached_script_skips_local_voice(dirs):
+    out, cache = dirs
+    util.text_to_speech(["One"], "alloy", "key", out, cache_dir=cache)
+
+    util.text_to_speech_draft(["One"], "alloy", out, cache)
+
+    assert FakeEngine.inits == 0
+
+
+def test_draft_ignores_other_voices(dirs):
+    out, cache = dirs
+    util.text_to_speech(["One"], "alloy", "key", out, cache_dir=cache)
+
+    assert read(util.text_to_speech_draft(["One"], "echo", out, cache)) == ["local:One"]
+
+
+def test_prune_drops_least_recently_used(dirs):
+    out, cache = dirs
+    util.text_to_speech(["One", "Two", "Three"], "alloy", "key", out, cache_dir=cache)
+    paths = [util.narration_cache_path(text, "alloy", cache) for text in ("One", "Two", "Three")]
+    for age, path in zip((300, 200, 100), paths):
+        os.utime(path, (0, os.path.getmtime(path) - age))
+
+    # A hit marks "One" as recently used, so "Two" is now the oldest
+    util.text_to_speech_draft(["One"], "alloy", out, cache)
+    removed = util.prune_narration_cache(os.path.getsize(paths[0]) + os.path.getsize(paths[2]), cache)
+
+    assert removed == 1
+    assert [os.path.exists(path) for path in paths] == [True, False, True]
+    assert util.prune_narration_cache(0, str(os.path.join(cache, "missing"))) == 0